@@ -1,149 +1,530 @@
+import argparse
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+import hashlib
+import mmap
+import os
 import re
+import tempfile
+import matplotlib
+
+# Headless/batch use only saves PNGs, so skip the GUI backend entirely;
+# HEADLESS=0 or HEADLESS=false leave it off
+if os.environ.get('HEADLESS', '').strip().lower() not in ('', '0', 'false', 'no', 'off'):
+    matplotlib.use('Agg')
+
 import matplotlib.pyplot as plt
 import numpy as np
 import pandas as pd
-import matplotlib.cm as cm
+from matplotlib.colors import to_hex
+from matplotlib.lines import Line2D
 import glob
 
+try:
+    from numba import njit, prange
+except ImportError:  # numba is optional; NumPy fallbacks are used without it
+    njit = None
+    prange = range
+
+# Operation names in code order; parse_log_files stores an int8 code per
+# entry and adjust_cumulative_seconds maps the codes back to a Categorical.
+OPERATION_TYPES = ['Insert', 'Update', 'Read']
+OPERATION_CODES = {op.encode(): code for code, op in enumerate(OPERATION_TYPES)}
+OPERATION_MARKERS = {'Insert': 'o', 'Update': 's', 'Read': '^'}
+
+# Log files are scanned as bytes, so nothing is decoded; bytes patterns
+# already use ASCII semantics for \d. [^\n] keeps a match on one line.
+ENTRY_PATTERN = re.compile(rb'\[Second (\d+)\][^\n]*?(Insert|Update|Read) completed in (\d+) ms')
+RUN_END_MARKER = b'All Operations completed'
+
+# Above this many values the digit conversion runs multi-threaded
+PARALLEL_THRESHOLD = 1_000_000
+
+# Above this many points the combined plot is aggregated with datashader
+DATASHADER_THRESHOLD = 100_000
+# Resolution of saved figures; point clouds are rasterized at this dpi
+SAVEFIG_DPI = 150
+
+# Outputs selectable with --plots
+PLOT_CHOICES = ['combined', 'separate', 'tat']
+
+# Bump when the parsed DataFrame layout changes to invalidate old caches
+CACHE_VERSION = 1
+
+# An Excel sheet holds 1,048,576 rows, one of which is the header
+EXCEL_MAX_DATA_ROWS = 1_048_575
+
+# --------------------------------------------------------------
+# Function: _parse_ints_kernel
+# Purpose : Converts the ASCII digit runs buf[starts[i]:ends[i]] to
+#           integers in out. Compiled with numba when it is installed.
+# --------------------------------------------------------------
+def _parse_ints_kernel(buf, starts, ends, out):
+    for i in range(starts.size):
+        value = 0
+        for j in range(starts[i], ends[i]):
+            value = value * 10 + buf[j] - 48
+        out[i] = value
+
+# --------------------------------------------------------------
+# Function: _parse_ints_parallel_kernel
+# Purpose : prange version of _parse_ints_kernel. It is a separate
+#           function because numba's on-disk cache does not key on the
+#           parallel flag, so two builds of one function share an entry.
+# --------------------------------------------------------------
+def _parse_ints_parallel_kernel(buf, starts, ends, out):
+    for i in prange(starts.size):
+        value = 0
+        for j in range(starts[i], ends[i]):
+            value = value * 10 + buf[j] - 48
+        out[i] = value
+
+# --------------------------------------------------------------
+# Function: _cumulative_seconds_kernel
+# Purpose : Single pass over entries ordered by run, adding to each
+#           second the sum of (max second + 1) of all earlier runs.
+# --------------------------------------------------------------
+def _cumulative_seconds_kernel(run, second, out):
+    offset = 0
+    current_run = run[0]
+    run_max_second = second[0]
+    for i in range(run.size):
+        if run[i] != current_run:
+            offset += run_max_second + 1
+            current_run = run[i]
+            run_max_second = second[i]
+        elif second[i] > run_max_second:
+            run_max_second = second[i]
+        out[i] = second[i] + offset
+
+if njit is not None:
+    _parse_ints_serial = njit(cache=True)(_parse_ints_kernel)
+    _parse_ints_parallel = njit(cache=True, parallel=True)(_parse_ints_parallel_kernel)
+    _cumulative_seconds_jit = njit(cache=True)(_cumulative_seconds_kernel)
+
+# --------------------------------------------------------------
+# Function: _parse_ints
+# Purpose : Converts the digit spans recorded by the regex pass into an
+#           int32 array, reading the digits straight from the mapped file.
+# Notes   : spans is a flat (start, end, start, end, ...) offset buffer.
+# --------------------------------------------------------------
+def _parse_ints(buf, spans):
+    spans = np.frombuffer(spans, dtype=np.int64)
+    starts = spans[0::2]
+    ends = spans[1::2]
+    out = np.zeros(starts.size, dtype=np.int32)
+    if not starts.size:
+        return out
+
+    data = np.frombuffer(buf, dtype=np.uint8)
+    if njit is None:
+        # Vectorized over entries, one step per digit position
+        lengths = ends - starts
+        for k in range(lengths.max()):
+            has_digit = lengths > k
+            out[has_digit] = out[has_digit] * 10 + (data[starts[has_digit] + k] - 48)
+    elif starts.size >= PARALLEL_THRESHOLD:
+        _parse_ints_parallel(data, starts, ends, out)
+    else:
+        _parse_ints_serial(data, starts, ends, out)
+    return out
+
+# --------------------------------------------------------------
+# Function: _parse_one_file
+# Purpose : Parses a single log file. Each file is mmap'd and scanned in
+#           C: run-end markers with a plain substring find, entries with
+#           a regex that starts with a literal so the engine can skip
+#           ahead to "[Second " hits.
+# Returns : (run_breaks, op_code, second, duration, marker_count), where
+#           run_breaks counts the run-end markers in this file that
+#           precede each entry.
+# --------------------------------------------------------------
+def _parse_one_file(filepath):
+    marker_offsets = array('q')
+    op_codes = array('b')
+    second_spans = array('q')
+    duration_spans = array('q')
+
+    # mmap cannot map an empty file
+    if os.path.getsize(filepath) == 0:
+        empty = np.zeros(0, dtype=np.int32)
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int8), empty, empty, 0
+
+    fd = os.open(filepath, os.O_RDONLY)
+    try:
+        buf = mmap.mmap(fd, 0, access=mmap.ACCESS_READ)
+    finally:
+        os.close(fd)
+
+    try:
+        # Both scans below read the file front to back once
+        if hasattr(mmap, 'MADV_SEQUENTIAL'):
+            buf.madvise(mmap.MADV_SEQUENTIAL)
+
+        offset = buf.find(RUN_END_MARKER)
+        while offset >= 0:
+            marker_offsets.append(offset)
+            offset = buf.find(RUN_END_MARKER, offset + len(RUN_END_MARKER))
+
+        # Only record digit offsets here; conversion happens in bulk below
+        for match in ENTRY_PATTERN.finditer(buf):
+            op_codes.append(OPERATION_CODES[match.group(2)])
+            second_spans.extend(match.span(1))
+            duration_spans.extend(match.span(3))
+        seconds = _parse_ints(buf, second_spans)
+        durations = _parse_ints(buf, duration_spans)
+    finally:
+        buf.close()
+
+    entry_offsets = np.frombuffer(second_spans, dtype=np.int64)[0::2]
+    run_breaks = np.searchsorted(np.frombuffer(marker_offsets, dtype=np.int64), entry_offsets)
+    return run_breaks, np.frombuffer(op_codes, dtype=np.int8), seconds, durations, len(marker_offsets)
+
 # --------------------------------------------------------------
 # Function: parse_log_files
 # Purpose : Reads log files matching the given pattern, extracts
 #           operations (Insert, Update, Read) and their durations.
-# Notes   : Groups entries by "run" using "All Operations completed".
+# Notes   : Groups entries by "run" using "All Operations completed";
+#           a run may continue from one file into the next. Files are
+#           parsed in parallel worker processes when there are several.
+# Returns : Dict of equal-length NumPy columns (run, second, op_code,
+#           duration); runs are numbered from 1 and empty runs skipped.
 # --------------------------------------------------------------
-def parse_log_files(file_pattern):
-    entry_pattern = re.compile(r'\[Second (\d+)\].*?(Insert|Update|Read) completed in (\d+) ms')
-    run_end_pattern = re.compile(r'All Operations completed')
+def parse_log_files(file_pattern, max_workers=None):
+    filepaths = sorted(glob.glob(file_pattern))
+    if len(filepaths) > 1:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            per_file = list(executor.map(_parse_one_file, filepaths))
+    else:
+        per_file = [_parse_one_file(filepath) for filepath in filepaths]
 
-    runs = []
-    current_run = []
+    run_breaks = [np.zeros(0, dtype=np.int64)]
+    op_codes = [np.zeros(0, dtype=np.int8)]
+    seconds = [np.zeros(0, dtype=np.int32)]
+    durations = [np.zeros(0, dtype=np.int32)]
+    markers_seen = 0
 
-    for filepath in sorted(glob.glob(file_pattern)):
-        with open(filepath, 'r') as file:
-            lines = file.readlines()
+    # Offset each file's marker counts by the markers in earlier files
+    for file_run_breaks, file_op_codes, file_seconds, file_durations, marker_count in per_file:
+        run_breaks.append(file_run_breaks + markers_seen)
+        op_codes.append(file_op_codes)
+        seconds.append(file_seconds)
+        durations.append(file_durations)
+        markers_seen += marker_count
 
-        for line in lines:
-            if run_end_pattern.search(line):
-                if current_run:
-                    runs.append(current_run)
-                    current_run = []
-            else:
-                match = entry_pattern.search(line)
-                if match:
-                    second = int(match.group(1))
-                    operation = match.group(2)
-                    duration = int(match.group(3))
-                    current_run.append({'second': second, 'operation': operation, 'duration': duration})
+    # Entries between the same pair of markers share a run; numbering
+    # only the breaks that occur skips runs that have no entries
+    run_breaks = np.concatenate(run_breaks)
+    run = np.cumsum(np.diff(run_breaks, prepend=-1) != 0, dtype=np.int32)
 
-    if current_run:
-        runs.append(current_run)
-
-    return runs
+    return {
+        'run': run,
+        'second': np.concatenate(seconds),
+        'op_code': np.concatenate(op_codes),
+        'duration': np.concatenate(durations),
+    }
 
 # --------------------------------------------------------------
 # Function: adjust_cumulative_seconds
 # Purpose : Ensures time continuity across multiple runs by adding
 #           cumulative offsets to seconds so that plots are aligned.
+# Returns : DataFrame with one row per entry (second, operation,
+#           duration, run, cumulative_second).
 # --------------------------------------------------------------
 def adjust_cumulative_seconds(runs):
-    adjusted_entries = []
-    cumulative_offset = 0
+    run = runs['run']
+    second = runs['second']
 
-    for run_index, run in enumerate(runs, start=1):
-        for entry in run:
-            adjusted_entry = entry.copy()
-            adjusted_entry['run'] = run_index
-            adjusted_entry['cumulative_second'] = entry['second'] + cumulative_offset
-            adjusted_entries.append(adjusted_entry)
-        if run:
-            max_second = max(entry['second'] for entry in run)
-            cumulative_offset += max_second + 1
+    # Each run is offset by the sum of (max second + 1) of all earlier runs
+    cumulative_second = second.astype(np.int64)
+    if run.size and njit is not None:
+        _cumulative_seconds_jit(run, second, cumulative_second)
+    elif run.size:
+        run_starts = np.flatnonzero(np.r_[True, run[1:] != run[:-1]])
+        run_max_second = np.maximum.reduceat(second, run_starts)
+        offsets = np.zeros(run_starts.size, dtype=np.int64)
+        offsets[1:] = np.cumsum(run_max_second + 1)[:-1]
+        cumulative_second += offsets[run - 1]
 
-    return adjusted_entries
+    return pd.DataFrame({
+        'second': second,
+        'operation': pd.Categorical.from_codes(runs['op_code'], OPERATION_TYPES),
+        'duration': runs['duration'],
+        'run': run,
+        'cumulative_second': cumulative_second,
+    })
+
+# --------------------------------------------------------------
+# Function: load_entries
+# Purpose : Parses and adjusts the logs matching the pattern, reusing a
+#           Parquet cache of the resulting DataFrame when none of the
+#           input files changed since it was written.
+# Notes   : The cache is stored as .logcache_<pattern>_<key>.parquet in
+#           cache_dir, where <key> hashes each file's path, size and
+#           mtime. A new cache replaces the stale ones for the same
+#           pattern; unreadable caches are treated as misses. Caching is
+#           skipped if no Parquet engine is installed.
+# --------------------------------------------------------------
+def load_entries(file_pattern, cache_dir='.'):
+    filepaths = sorted(glob.glob(file_pattern))
+    if not filepaths:
+        return adjust_cumulative_seconds(parse_log_files(file_pattern))
+
+    file_stats = []
+    for path in filepaths:
+        stat = os.stat(path)
+        file_stats.append((path, stat.st_size, stat.st_mtime_ns))
+    pattern_key = hashlib.md5(os.path.abspath(file_pattern).encode()).hexdigest()[:12]
+    key = hashlib.md5(repr((CACHE_VERSION, file_stats)).encode()).hexdigest()
+    cache_prefix = os.path.join(cache_dir, f'.logcache_{pattern_key}_')
+    cache_file = f'{cache_prefix}{key}.parquet'
+
+    if os.path.exists(cache_file):
+        try:
+            return pd.read_parquet(cache_file)
+        except (ImportError, OSError, ValueError):
+            # No Parquet engine, or a truncated/corrupt cache; reparse below
+            pass
+
+    entries = adjust_cumulative_seconds(parse_log_files(file_pattern))
+
+    # Write under a temporary name so an interrupted run never leaves a
+    # truncated file at the cache path. The cache is best-effort: without
+    # a Parquet engine or a writable cache_dir the parsed entries are
+    # still returned.
+    tmp_file = None
+    try:
+        fd, tmp_file = tempfile.mkstemp(prefix='.logcache_', suffix='.tmp', dir=cache_dir)
+        os.close(fd)
+        entries.to_parquet(tmp_file, compression='zstd')
+        # mkstemp creates the file 0600; give the cache a normal mode so
+        # other users sharing cache_dir can read it
+        umask = os.umask(0)
+        os.umask(umask)
+        os.chmod(tmp_file, 0o644 & ~umask)
+        os.replace(tmp_file, cache_file)
+    except (ImportError, OSError):
+        return entries
+    finally:
+        if tmp_file is not None and os.path.exists(tmp_file):
+            os.remove(tmp_file)
+
+    for stale_file in glob.glob(glob.escape(cache_prefix) + '*.parquet'):
+        if stale_file != cache_file:
+            try:
+                os.remove(stale_file)
+            except OSError:
+                pass
+    return entries
 
 # --------------------------------------------------------------
 # Function: get_run_colors
 # Purpose : Assigns distinct colors to each run using matplotlib colormap.
+# Returns : (num_runs, 4) RGBA array; row run - 1 is the color of a run.
 # --------------------------------------------------------------
 def get_run_colors(num_runs):
-    cmap = cm.get_cmap('tab10', num_runs)
-    return [cmap(i) for i in range(num_runs)]
+    return plt.colormaps['tab10'].resampled(num_runs)(np.arange(num_runs))
+
+# --------------------------------------------------------------
+# Function: group_operation_runs
+# Purpose : Sorts entries by time once and partitions them by
+#           (operation, run) in a single groupby, giving each run's
+#           line in plot_separate_operation_graphs its points in order.
+# Returns : Dict mapping (operation, run) to its time-ordered rows.
+# --------------------------------------------------------------
+def group_operation_runs(entries):
+    sorted_entries = entries.sort_values(['cumulative_second', 'duration'])
+    return dict(list(sorted_entries.groupby(['operation', 'run'], observed=True)))
+
+# --------------------------------------------------------------
+# Function: run_legend_handles
+# Purpose : Builds one legend entry per run, since a single scatter
+#           now carries the colors of many runs.
+# --------------------------------------------------------------
+def run_legend_handles(run_color_lut, run_ids, marker='o'):
+    return [Line2D([], [], marker=marker, linestyle='', color=run_color_lut[run - 1], label=f'Run {run}')
+            for run in run_ids]
+
+# --------------------------------------------------------------
+# Function: plot_combined_datashader
+# Purpose : Renders the combined point cloud as a datashader image,
+#           one color per run, and shows it on the current axes.
+# --------------------------------------------------------------
+def plot_combined_datashader(entries, run_color_lut):
+    import datashader
+
+    x_range = (entries['cumulative_second'].min(), entries['cumulative_second'].max())
+    y_range = (entries['duration'].min(), entries['duration'].max())
+    canvas = datashader.Canvas(plot_width=1200, plot_height=600, x_range=x_range, y_range=y_range)
+
+    points = entries.assign(run=pd.Categorical(entries['run']))
+    agg = canvas.points(points, 'cumulative_second', 'duration', agg=datashader.count_cat('run'))
+    color_key = [to_hex(run_color_lut[run - 1]) for run in points['run'].cat.categories]
+    image = datashader.transfer_functions.shade(agg, color_key=color_key, min_alpha=100)
+    image = datashader.transfer_functions.dynspread(image)
+    image = datashader.transfer_functions.set_background(image, 'white').to_pil()
+
+    plt.imshow(image, extent=(*x_range, *y_range), aspect='auto')
 
 # --------------------------------------------------------------
 # Function: plot_combined_operations
 # Purpose : Plots all operations (Insert, Update, Read) together in one graph
-#           with runs differentiated by color.
+#           with runs differentiated by color and operations by marker.
+# Notes   : One scatter call per operation with a per-point color array,
+#           instead of one call (and PathCollection) per (operation, run).
+#           Points are rasterized; past DATASHADER_THRESHOLD points the
+#           cloud is aggregated with datashader when it is installed.
 # --------------------------------------------------------------
 def plot_combined_operations(entries):
-    if not entries:
+    if entries.empty:
         print("No entries to plot.")
         return
 
-    operation_types = ['Insert', 'Update', 'Read']
-    run_ids = sorted(set(e['run'] for e in entries))
-    run_colors = dict(zip(run_ids, get_run_colors(len(run_ids))))
+    run_ids = sorted(entries['run'].unique())
+    run_color_lut = get_run_colors(run_ids[-1])
+
+    fig = plt.figure(figsize=(12, 6))
+    # datashader pulls in dask/xarray, so it is only imported when needed
+    use_datashader = len(entries) > DATASHADER_THRESHOLD
+    if use_datashader:
+        try:
+            import datashader
+        except ImportError:  # datashader is optional; large plots stay rasterized scatters
+            use_datashader = False
 
-    plt.figure(figsize=(12, 6))
-    for op in operation_types:
-        for run in run_ids:
-            filtered = [(e['cumulative_second'], e['duration']) for e in entries if e['operation'] == op and e['run'] == run]
-            if filtered:
-                x, y = zip(*sorted(filtered))
-                plt.scatter(x, y, label=f'{op} - Run {run}', alpha=0.6, color=run_colors[run])
+    if use_datashader:
+        plot_combined_datashader(entries, run_color_lut)
+        plt.legend(handles=run_legend_handles(run_color_lut, run_ids, marker='s'))
+    else:
+        for op, op_entries in entries.groupby('operation', observed=True):
+            plt.scatter(op_entries['cumulative_second'].values, op_entries['duration'].values,
+                        c=run_color_lut[op_entries['run'].values - 1], marker=OPERATION_MARKERS[op],
+                        alpha=0.6, rasterized=True)
 
+        op_handles = [Line2D([], [], marker=OPERATION_MARKERS[op], linestyle='', color='gray', label=op)
+                      for op in OPERATION_TYPES]
+        plt.legend(handles=op_handles + run_legend_handles(run_color_lut, run_ids))
     plt.xlabel('Cumulative Time (s)')
     plt.ylabel('Duration (ms)')
     plt.title('Combined Operation Durations Over Time')
-    plt.legend()
     plt.grid(True)
     plt.tight_layout()
-    plt.savefig('combined_operation_durations_xcap.png')
-    #plt.show()
+    plt.savefig('combined_operation_durations_xcap.png', dpi=SAVEFIG_DPI)
+    plt.close(fig)
 
 # --------------------------------------------------------------
 # Function: plot_separate_operation_graphs
 # Purpose : Plots one graph per operation type, showing durations across runs.
+# Notes   : One plot call per run keeps the markers on Line2D's fast
+#           marker path; there are only a handful of runs per graph.
 # --------------------------------------------------------------
 def plot_separate_operation_graphs(entries):
-    if not entries:
+    if entries.empty:
         print("No entries to plot.")
         return
 
-    operation_types = ['Insert', 'Update', 'Read']
-    run_ids = sorted(set(entry['run'] for entry in entries))
-    run_colors = dict(zip(run_ids, get_run_colors(len(run_ids))))
-
-    for op_type in operation_types:
-        plt.figure(figsize=(10, 5))
-        for run in run_ids:
-            filtered = [(entry['cumulative_second'], entry['duration'])
-                        for entry in entries if entry['operation'] == op_type and entry['run'] == run]
-            if filtered:
-                x, y = zip(*sorted(filtered))
-                plt.plot(x, y, marker='o', linestyle='-', label=f'Run {run}', color=run_colors[run])
+    groups = group_operation_runs(entries)
+    run_color_lut = get_run_colors(entries['run'].max())
+
+    for op_type in OPERATION_TYPES:
+        fig = plt.figure(figsize=(10, 5))
+        for (op, run), group in groups.items():
+            if op == op_type:
+                plt.plot(group['cumulative_second'].values, group['duration'].values, marker='o', linestyle='-',
+                         label=f'Run {run}', color=run_color_lut[run - 1], rasterized=True)
+        if plt.gca().has_data():
+            plt.legend()
         plt.xlabel('Cumulative Time (s)')
         plt.ylabel(f'{op_type} Duration (ms)')
         plt.title(f'{op_type} Operation Durations Over Time')
-        plt.legend()
         plt.grid(True)
         plt.tight_layout()
-        plt.savefig(f'{op_type.lower()}_operation_durations_xcap.png')
-        #plt.show()
+        plt.savefig(f'{op_type.lower()}_operation_durations_xcap.png', dpi=SAVEFIG_DPI)
+        # Release the figure before the next one is built
+        plt.close(fig)
+
+# --------------------------------------------------------------
+# Function: plot_tat_growth_trend
+# Purpose : Remove statistical outliers, fit linear regression lines
+#           for each operation type, and plot trendlines to show how
+#           duration changes over cumulative time.
+# --------------------------------------------------------------
+def plot_tat_growth_trend(entries):
+    if entries.empty:
+        print("No data to plot.")
+        return
+
+    # Outlier removal using IQR per operation type, with the bounds
+    # broadcast back to every row so one boolean mask filters all of them
+    grouped = entries.groupby('operation', observed=True)['duration']
+    Q1 = grouped.transform('quantile', 0.25)
+    Q3 = grouped.transform('quantile', 0.75)
+    IQR = Q3 - Q1
+    filtered_df = entries[(entries['duration'] >= Q1 - 1.5 * IQR) & (entries['duration'] <= Q3 + 1.5 * IQR)]
+
+    # Plot regression trendlines per operation
+    fig = plt.figure(figsize=(14, 7))
+    colors = {'Insert': 'blue', 'Update': 'green', 'Read': 'orange'}
+
+    for op, op_data in filtered_df.groupby('operation', observed=True):
+        x = op_data['cumulative_second'].values
+        y = op_data['duration'].values
+
+        # Fit linear regression line (closed-form least squares)
+        x_mean = x.mean()
+        y_mean = y.mean()
+        x_var = ((x - x_mean) ** 2).sum()
+        slope = ((x - x_mean) * (y - y_mean)).sum() / x_var if x_var else 0.0
+        intercept = y_mean - slope * x_mean
+
+        # Plot predicted regression line; a straight line only needs its endpoints
+        x_line = np.array([x.min(), x.max()])
+        y_line = slope * x_line + intercept
+        plt.plot(
+            x_line,
+            y_line,
+            linestyle='--',
+            color=colors.get(op, 'gray'),
+            label=f'{op} Trend (slope={slope:.6f})'
+        )
+
+    plt.xlabel('Cumulative Time (s)')
+    plt.ylabel('Duration (ms)')
+    plt.title('TAT Growth Trend by Operation Type (Outliers Removed)')
+    plt.legend()
+    plt.grid(True)
+    plt.tight_layout()
+    plt.savefig('tat_growth_trend_by_operation.png')
+    plt.close(fig)
+
+# --------------------------------------------------------------
+# Function: write_sheet_rows
+# Purpose : Writes a DataFrame to a new xlsxwriter worksheet one row at a
+#           time. A constant_memory workbook flushes each row as the next
+#           one starts, so cells must arrive in row order (DataFrame.to_excel
+#           writes column by column).
+# --------------------------------------------------------------
+def write_sheet_rows(workbook, sheet_name, df):
+    worksheet = workbook.add_worksheet(sheet_name)
+    worksheet.write_row(0, 0, df.columns, workbook.add_format({'bold': True}))
+    for row_index, row in enumerate(df.itertuples(index=False, name=None), start=1):
+        worksheet.write_row(row_index, 0, row)
 
 # --------------------------------------------------------------
 # Function: export_to_excel
 # Purpose : Exports raw operation data and summary statistics to Excel.
 # Sheets  :
-#   - Raw Data (all logs with run/operation/durations)
+#   - Raw Data (all logs with run/operation/durations; written to a
+#     Parquet file next to the workbook if it exceeds the sheet limit)
 #   - Run Statistics (per run per operation stats)
 #   - Consolidated Summary (overall operation stats)
 # --------------------------------------------------------------
 def export_to_excel(entries, output_file='operation_stats.xlsx'):
-    if not entries:
+    if entries.empty:
         print("No entries to export.")
         return
 
-    df = pd.DataFrame(entries)
+    df = entries
 
     # Raw data
     raw_data = df[['run', 'second', 'cumulative_second', 'operation', 'duration']]
@@ -151,37 +532,89 @@ def export_to_excel(entries, output_file='operation_stats.xlsx'):
 
     # Run-wise stats
     df_nonzero = df[df['duration'] > 0]
-    run_stats = df_nonzero.groupby(['run', 'operation'])['duration'].agg(
+    run_stats = df_nonzero.groupby(['run', 'operation'], observed=True)['duration'].agg(
         Count='count',
         Mean_ms='mean',
         Min_ms='min',
         Max_ms='max'
     ).reset_index()
-    run_stats.columns = ['Run', 'Operation', 'Count', 'Mean Duration (ms)', 'Min Duration (ms)', 'Max Duration (ms)']
+    # Report operations alphabetically rather than in Categorical code order
+    run_stats['operation'] = run_stats['operation'].astype(str)
+    run_stats = run_stats.sort_values(['run', 'operation'], ignore_index=True)
 
-    # Consolidated stats
-    consolidated = df_nonzero.groupby(['operation'])['duration'].agg(
-        Total_Count='count',
-        Average_Duration='mean',
-        Minimum_Duration='min',
-        Maximum_Duration='max'
-    ).reset_index()
+    # Consolidated stats, re-aggregated from the per-run stats rather than
+    # another pass over every entry; the mean is weighted by run counts
+    consolidated = run_stats.assign(
+        Total_ms=run_stats['Count'] * run_stats['Mean_ms']
+    ).groupby('operation').agg(
+        Total_Count=('Count', 'sum'),
+        Total_ms=('Total_ms', 'sum'),
+        Minimum_Duration=('Min_ms', 'min'),
+        Maximum_Duration=('Max_ms', 'max')
+    )
+    consolidated.insert(1, 'Average_Duration', consolidated.pop('Total_ms') / consolidated['Total_Count'])
+    consolidated = consolidated.reset_index()
+
+    run_stats.columns = ['Run', 'Operation', 'Count', 'Mean Duration (ms)', 'Min Duration (ms)', 'Max Duration (ms)']
     consolidated.columns = [ 'Operation', 'Total Count', 'Average Duration (ms)', 'Minimum Duration (ms)', 'Maximum Duration (ms)']
 
-    # Write to Excel
-    with pd.ExcelWriter(output_file, engine='openpyxl') as writer:
-        raw_data.to_excel(writer, sheet_name='Raw Data', index=False)
-        run_stats.to_excel(writer, sheet_name='Run Statistics', index=False)
-        consolidated.to_excel(writer, sheet_name='Consolidated Summary', index=False)
+    # Raw data beyond what one sheet can hold goes to Parquet instead
+    write_raw_sheet = len(raw_data) <= EXCEL_MAX_DATA_ROWS
+    if not write_raw_sheet:
+        raw_file = os.path.splitext(output_file)[0] + '_raw_data.parquet'
+        raw_data.to_parquet(raw_file, index=False)
+        print(f"Raw data has {len(raw_data)} rows; written to {raw_file} instead of the 'Raw Data' sheet.")
+
+    # Write to Excel, streaming rows to disk rather than building the workbook in memory
+    with pd.ExcelWriter(output_file, engine='xlsxwriter',
+                        engine_kwargs={'options': {'constant_memory': True}}) as writer:
+        if write_raw_sheet:
+            write_sheet_rows(writer.book, 'Raw Data', raw_data)
+        write_sheet_rows(writer.book, 'Run Statistics', run_stats)
+        write_sheet_rows(writer.book, 'Consolidated Summary', consolidated)
+
+# --------------------------------------------------------------
+# Function: main
+# Purpose : Command-line driver. Parses the logs once (or loads the
+#           cached parse) and produces every requested output from the
+#           same DataFrame.
+# --------------------------------------------------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Plot and export Insert/Update/Read durations from log files.')
+    parser.add_argument('log_pattern', nargs='?',
+                        help='log file path or glob pattern, e.g. "logs/spring.log.*" (prompted for if omitted)')
+    parser.add_argument('--plots', default=','.join(PLOT_CHOICES),
+                        help=f'comma-separated plots to draw, from {",".join(PLOT_CHOICES)}; empty for none (default: all)')
+    parser.add_argument('--excel', default='operation_stats.xlsx', metavar='PATH',
+                        help='Excel report to write; empty to skip (default: %(default)s)')
+    parser.add_argument('--batch', action='store_true',
+                        help='render with the non-interactive Agg backend (same as setting HEADLESS=1)')
+    args = parser.parse_args(argv)
+
+    if args.batch:
+        plt.switch_backend('Agg')
+
+    plots = [plot.strip() for plot in args.plots.split(',') if plot.strip()]
+    unknown = sorted(set(plots) - set(PLOT_CHOICES))
+    if unknown:
+        parser.error(f"unknown plot(s): {', '.join(unknown)}")
+
+    log_pattern = args.log_pattern
+    if log_pattern is None:
+        log_pattern = input("Enter the log file path or pattern (e.g., logs/spring.log.*): ").strip()
+
+    adjusted_entries = load_entries(log_pattern)
+    if 'combined' in plots:
+        plot_combined_operations(adjusted_entries)
+    if 'separate' in plots:
+        plot_separate_operation_graphs(adjusted_entries)
+    if 'tat' in plots:
+        plot_tat_growth_trend(adjusted_entries)
+    if args.excel:
+        export_to_excel(adjusted_entries, args.excel)
 
 # --------------------------------------------------------------
 # Main Script Entry
-# Purpose : Adjust log pattern, run parsing, plotting, and export.
 # --------------------------------------------------------------
 if __name__ == '__main__':
-    log_pattern = input("Enter the log file path or pattern (e.g., logs/spring.log.*): ").strip()
-    runs = parse_log_files(log_pattern)
-    adjusted_entries = adjust_cumulative_seconds(runs)
-    plot_combined_operations(adjusted_entries)
-    plot_separate_operation_graphs(adjusted_entries)
-    export_to_excel(adjusted_entries)
+    main()